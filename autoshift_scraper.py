@@ -13,7 +13,8 @@ import shlex, sys
 from github import Github, InputGitTreeElement
 from github.GithubException import GithubException, UnknownObjectException
 
-from common import _L, DEBUG, DIRNAME, INFO
+import common
+from common import _L, DEBUG, INFO, debug_lazy, flush_logs
 
 # --- Central (Gearbox) timezone support for pretty timestamps ---
 try:
@@ -210,10 +211,7 @@ def cleanse_codes(codes):
 
 def scrape_codes(webpage):
     _L.info(
-        "Requesting webpage for "
-        + webpage.get("game")
-        + ": "
-        + webpage.get("sourceURL")
+        "Requesting webpage for %s: %s", webpage.get("game"), webpage.get("sourceURL")
     )
     # CHANGE: Add timeout + user-agent to avoid hangs/blocks; raise for non-2xx to fail fast.
     r = requests.get(
@@ -225,7 +223,7 @@ def scrape_codes(webpage):
 
     # record the time we scraped the URL
     scrapedDateAndTime = datetime.now(timezone.utc)
-    _L.info(" Collected at: " + str(scrapedDateAndTime))
+    _L.info(" Collected at: %s", scrapedDateAndTime)
     # print(r.content)
 
     soup = BeautifulSoup(
@@ -247,11 +245,11 @@ def scrape_codes(webpage):
         table_html_blocks.append(table_html)
 
     platforms = webpage.get("platform_ordered_tables")
-    _L.info(" Expecting tables: " + str(len(platforms)))
+    _L.info(" Expecting tables: %d", len(platforms))
     _L.info(
-        " Collected tables: "
-        + str(len(table_html_blocks))
-        + (" (from " + str(len(figures)) + " <figure> blocks)" if DEBUG else "")
+        " Collected tables: %d%s",
+        len(table_html_blocks),
+        (" (from %d <figure> blocks)" % len(figures)) if DEBUG else "",
     )
 
     # headers = []
@@ -268,14 +266,15 @@ def scrape_codes(webpage):
                 )
                 continue
             _L.warning(
-                f"More tables found ({len(table_html_blocks)}) than expected ({len(platforms)}) for {webpage.get('game')}. Skipping extra tables."
+                "More tables found (%d) than expected (%d) for %s. Skipping extra tables.",
+                len(table_html_blocks),
+                len(platforms),
+                webpage.get("game"),
             )
             break
 
         platform = platforms[table_count]
-        _L.info(
-            " Parsing for table #" + str(table_count) + " - " + platform
-        )
+        _L.info(" Parsing for table #%d - %s", table_count, platform)
 
         # Don't parse any tables marked to discard
         if platform == "discard":
@@ -329,7 +328,8 @@ def scrape_codes(webpage):
         # print("RESULT: " + str(i)+ " : " + table)
 
         table_count += 1
-    _L.debug(json.dumps(code_tables, indent=2, default=str))
+    # DEV NOTE: json.dumps over every raw table is expensive; only build it when --verbose is on.
+    debug_lazy(json.dumps, code_tables, indent=2, default=str)
     return code_tables
 
 
@@ -448,8 +448,8 @@ def generateAutoshiftJSON(website_code_tables, previous_codes, include_expired):
                                 "archived": str(code_table.get("archived")),
                                 "row": code,
                             }
-                            makedirs(path.join(DIRNAME, "data"), exist_ok=True)
-                            fn = path.join(DIRNAME, "data", "debug_problem_rows.json")
+                            makedirs(path.join(common.DIRNAME, "data"), exist_ok=True)
+                            fn = path.join(common.DIRNAME, "data", "debug_problem_rows.json")
                             # append JSON objects one per line so it's easy to inspect
                             with open(fn, "a") as df:
                                 df.write(json.dumps(debug_record, default=str) + "\n")
@@ -684,7 +684,7 @@ def setup_argparser():
 def scrape_polygon_bl4_codes(existing_codes_set):
     url = "https://www.polygon.com/borderlands-4-active-shift-codes-redeem/"
     try:
-        _L.info("Requesting Polygon BL4 codes: " + url)
+        _L.info("Requesting Polygon BL4 codes: %s", url)
         # add a simple user-agent to reduce chance of being blocked
         r = requests.get(
             url, timeout=15, headers={"User-Agent": "autoshift-scraper/1.0"}
@@ -789,7 +789,7 @@ def scrape_polygon_bl4_codes(existing_codes_set):
         )
         return codes
     except Exception as e:
-        _L.error(f"Polygon BL4: Error scraping codes: {e}")
+        _L.error("Polygon BL4: Error scraping codes: %s", e)
         return []
 
 
@@ -804,7 +804,7 @@ def scrape_ign_bl4_codes(existing_codes_set):
     """
     url = "https://www.ign.com/wikis/borderlands-4/Borderlands_4_SHiFT_Codes"
     # always log intent to request before doing the network call so the entry appears in logs
-    _L.info("Requesting IGN BL4 codes: " + url)
+    _L.info("Requesting IGN BL4 codes: %s", url)
     try:
         r = requests.get(
             url, timeout=15, headers={"User-Agent": "autoshift-scraper/1.0"}
@@ -883,7 +883,7 @@ def scrape_ign_bl4_codes(existing_codes_set):
         )
         return codes
     except Exception as e:
-        _L.error(f"IGN BL4: Error scraping codes: {e}")
+        _L.error("IGN BL4: Error scraping codes: %s", e)
         return []
 
 
@@ -894,7 +894,7 @@ def scrape_xsmash_codes(existing_codes_set):
     """
     url = "https://raw.githubusercontent.com/xsmashx88x/Shift-Codes/refs/heads/gh-pages/index.html"
     try:
-        _L.info("Requesting xsmashx88x Shift-Codes page: " + url)
+        _L.info("Requesting xsmashx88x Shift-Codes page: %s", url)
         r = requests.get(
             url, timeout=15, headers={"User-Agent": "autoshift-scraper/1.0"}
         )
@@ -1027,7 +1027,7 @@ def scrape_xsmash_codes(existing_codes_set):
         )
         return candidates
     except Exception as e:
-        _L.error(f"xsmash parser: Error scraping codes: {e}")
+        _L.error("xsmash parser: Error scraping codes: %s", e)
         return []
 
 
@@ -1155,6 +1155,15 @@ def upload_shiftfile(filepath, user, repo_name, token, commit_msg=None, branch=N
         return False
 
 def main(args):
+    try:
+        _main(args)
+    finally:
+        # Also on errors: write this run's log lines before a traceback, or before the
+        # scheduler sits idle until the next run.
+        flush_logs()
+
+
+def _main(args):
 
     # CHANGE: Respect --file (or env-backed default) for both writing and uploading.
     shiftfile_path = args.file
@@ -1206,7 +1215,8 @@ def main(args):
                     # Add new codes to this table
                     code_table["codes"].extend(polygon_bl4_codes)
                     _L.info(
-                        f"Polygon BL4: Added {len(polygon_bl4_codes)} codes to Borderlands 4 universal"
+                        "Polygon BL4: Added %d codes to Borderlands 4 universal",
+                        len(polygon_bl4_codes),
                     )
                     break
 
@@ -1233,7 +1243,8 @@ def main(args):
                 ):
                     code_table["codes"].extend(ign_bl4_codes)
                     _L.info(
-                        f"IGN BL4: Added {len(ign_bl4_codes)} codes to Borderlands 4 universal"
+                        "IGN BL4: Added %d codes to Borderlands 4 universal",
+                        len(ign_bl4_codes),
                     )
                     break
 
@@ -1258,7 +1269,8 @@ def main(args):
                 ):
                     code_table["codes"].extend(xsmash_codes)
                     _L.info(
-                        f"xsmash: Added {len(xsmash_codes)} codes to Borderlands 4 universal"
+                        "xsmash: Added %d codes to Borderlands 4 universal",
+                        len(xsmash_codes),
                     )
                     break
 
@@ -1269,9 +1281,7 @@ def main(args):
     _L.info("Scraping Complete. Now writing out shiftcodes.json file")
 
     _L.info(
-        "Found "
-        + str(codes_inc_expired[0].get("meta").get("newcodecount"))
-        + " new codes."
+        "Found %s new codes.", codes_inc_expired[0].get("meta").get("newcodecount")
     )
 
     # Write out the file even if no new codes so we can track last scrape time
@@ -1288,9 +1298,11 @@ def main(args):
                 if codes_inc_expired[0].get("meta").get("newcodecount") > 0
                 else "migrated shiftcodes file"
             )
+            # upload_shiftfile() reports via print(); keep buffered log lines ahead of it.
+            flush_logs()
             ok = upload_shiftfile(shiftfile_path, args.user, args.repo, args.token, commit_msg=commit_msg)
             if ok:
-                _L.info(f"Uploaded updated {path.basename(shiftfile_path)} to GitHub.")
+                _L.info("Uploaded updated %s to GitHub.", path.basename(shiftfile_path))
             else:
                 _L.error("Upload attempt failed.")
         else:
@@ -1336,22 +1348,24 @@ if __name__ == "__main__":
                     )
                 else:
                     _L.warning(
-                        f"Running this tool every {hours} hours would result in too many requests.\n"
-                        "Scheduling changed to run every 2 hours!"
+                        "Running this tool every %s hours would result in too many requests.\n"
+                        "Scheduling changed to run every 2 hours!",
+                        hours,
                     )
                     hours = 2.0
             # robust: convert total hours to total minutes (rounded) then split
             total_minutes = int(round(hours * 60))
             h, m = divmod(total_minutes, 60)
-            _L.info(f"Scheduling to run every {h:02}:{m:02} hours")
+            _L.info("Scheduling to run every %02d:%02d hours", h, m)
             scheduler.add_job(main, "interval", args=(args,), hours=hours)
         else:  # minutes
             minutes = int(val)
             hh = minutes // 60
             mm = minutes % 60
-            _L.info(f"Scheduling to run every {hh:02}:{mm:02} (hh:mm)")
+            _L.info("Scheduling to run every %02d:%02d (hh:mm)", hh, mm)
             scheduler.add_job(main, "interval", args=(args,), minutes=minutes)
 
+        flush_logs()
         print(f"Press Ctrl+{'Break' if os.name == 'nt' else 'C'} to exit")
         try:
             scheduler.start()
@@ -19,18 +19,24 @@
 # along with autoshift.  If not, see <http://www.gnu.org/licenses/>.
 #
 #############################################################################
+import atexit
 import logging
 from logging import CRITICAL, DEBUG, ERROR, INFO, NOTSET, WARNING
+from logging.handlers import QueueHandler, QueueListener
 from os import path
 import os
+import queue
 import sys
-from datetime import datetime
+import threading
+import time
+import traceback
 
 try:
     import rich  # noqa: F401
     from rich.console import Console
     from rich.logging import RichHandler  # noqa: F401
     from rich.markup import escape
+    from rich.text import Text
 except ImportError as exc:  # pragma: no cover - hard requirement message
     sys.stderr.write(
         "Missing optional dependency 'rich'.\n"
@@ -38,8 +44,18 @@ except ImportError as exc:  # pragma: no cover - hard requirement message
     )
     raise SystemExit(1) from exc
 
-FILEPATH = path.realpath(__file__)
-DIRNAME = path.dirname(FILEPATH)
+_EXC_FORMATTER = logging.Formatter()
+
+def __getattr__(name):
+    # FILEPATH/DIRNAME are resolved on first access (PEP 562) and then cached as globals.
+    if name == "FILEPATH":
+        value = path.realpath(__file__)
+    elif name == "DIRNAME":
+        value = path.dirname(__getattr__("FILEPATH"))
+    else:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    globals()[name] = value
+    return value
 
 
 def dim_text(message: str) -> str:
@@ -47,6 +63,17 @@ def dim_text(message: str) -> str:
     return f"[#767676]{escape(message)}[/]"
 
 
+class AutoshiftLogRecord(logging.LogRecord):
+    """LogRecord with a class-level ``rich_markup`` default.
+
+    Handlers can read ``record.rich_markup`` directly, while call sites still opt in
+    per record with ``extra={"rich_markup": True}`` (an instance attribute would make
+    ``Logger.makeRecord`` reject that key).
+    """
+
+    rich_markup = False
+
+
 class LegacyRichHandler(logging.Handler):
     """Reproduce the prior ANSI-styled output using Rich for rendering."""
 
@@ -62,58 +89,244 @@ class LegacyRichHandler(logging.Handler):
         CRITICAL: "bold red",
     }
 
+    # logging.Handler still provides a __dict__ for its own attributes; slotting the
+    # handler's per-record state keeps those reads off the instance dict.
+    __slots__ = (
+        "console",
+        "datefmt",
+        "_buffer",
+        "_ts_cache_key",
+        "_ts_cache_val",
+        "_level_cache",
+    )
+
+    LINE_TEMPLATE = "%s %s%s%s"
+    TIME_TEMPLATE = f"[{TIME_STYLE}]%s[/]"
+    MODULE_TEMPLATE = f"[{MODULE_STYLE}]%s:%d - [/]"
+    BUFFER_LIMIT = 32
+
     def __init__(self, console: Console, datefmt: str = "%Y-%m-%d %H:%M:%S"):
         super().__init__()
         self.console = console
         self.datefmt = datefmt
+        # Rendered lines waiting for a single write; see flush().
+        self._buffer = []
+        atexit.register(self.flush)
+        # Records arrive in bursts; reuse the rendered timestamp within the same second.
+        self._ts_cache_key = -1
+        self._ts_cache_val = ""
+        # Bracketed level label + padding only depend on the level, so build them once.
+        self._level_cache = {
+            levelno: self._level_prefix(levelno, logging.getLevelName(levelno))
+            for levelno in self.LEVEL_STYLES
+        }
 
-    def format_message(self, record: logging.LogRecord) -> str:
-        base_message = record.getMessage()
-        if record.exc_info and not record.exc_text:
-            record.exc_text = self.formatException(record.exc_info)
+    def _level_prefix(self, levelno: int, levelname: str) -> str:
+        level_style = self.LEVEL_STYLES.get(levelno, "bold white")
+        bracket_markup = (
+            f"[{self.BRACKET_STYLE}][[/]"
+            f"[{level_style}]{levelname}[/]"
+            f"[{self.BRACKET_STYLE}]][/]"
+        )
+        return bracket_markup + " " + " " * max(0, 8 - len(levelname))
+
+    def base_message(self, record: logging.LogRecord) -> str:
+        # Reuse the interpolated message if another handler/formatter already built it.
+        base_message = getattr(record, "message", None)
+        if base_message is None:
+            if record.args:
+                base_message = record.getMessage()
+            else:
+                msg = record.msg
+                base_message = msg if isinstance(msg, str) else str(msg)
+            record.message = base_message
+        if record.exc_info and record.exc_text is None:
+            # logging.Handler has no formatException(); borrow the (default) Formatter's.
+            record.exc_text = (self.formatter or _EXC_FORMATTER).formatException(
+                record.exc_info
+            )
+            # Like QueueHandler.prepare(): later handlers reuse exc_text without re-checking.
+            record.exc_info = None
         if record.exc_text:
             base_message = f"{base_message}\n{record.exc_text}"
+        return base_message
 
-        if getattr(record, "rich_markup", False):
+    def format_message(self, record: logging.LogRecord) -> str:
+        base_message = self.base_message(record)
+        if record.rich_markup:
+            return base_message
+        # escape() only rewrites '[' tags and a trailing backslash; skip its regex otherwise.
+        if "[" not in base_message and "\\" not in base_message:
             return base_message
         return escape(base_message)
 
     def emit(self, record: logging.LogRecord) -> None:
         try:
             message = self.format_message(record)
-            asctime = datetime.fromtimestamp(record.created).strftime(self.datefmt)
-            time_markup = f"[{self.TIME_STYLE}]{asctime}[/]"
-            level_style = self.LEVEL_STYLES.get(record.levelno, "bold white")
-            bracket_markup = (
-                f"[{self.BRACKET_STYLE}][[/]"
-                f"[{level_style}]{record.levelname}[/]"
-                f"[{self.BRACKET_STYLE}]][/]"
-            )
-            spaces = " " * max(0, 8 - len(record.levelname))
+            sec = int(record.created)
+            if sec != self._ts_cache_key:
+                asctime = time.strftime(self.datefmt, time.localtime(sec))
+                self._ts_cache_val = self.TIME_TEMPLATE % asctime
+                self._ts_cache_key = sec
+            time_markup = self._ts_cache_val
+            level_prefix = self._level_cache.get(record.levelno)
+            if level_prefix is None:
+                # Custom levels (logging.addLevelName) are cached on first use.
+                level_prefix = self._level_prefix(record.levelno, record.levelname)
+                self._level_cache[record.levelno] = level_prefix
             module_markup = ""
             if record.levelno == DEBUG:
-                module_name = escape(record.module or "")
-                module_markup = (
-                    f"[{self.MODULE_STYLE}]{module_name}:{record.lineno} - [/]"
-                )
-            output = (
-                f"{time_markup} {bracket_markup} {spaces}{module_markup}{message}"
+                # Module names come from Python source file stems; they never need escape().
+                module_markup = self.MODULE_TEMPLATE % (record.module, record.lineno)
+            # Parse markup per record so a bad or unclosed tag stays with its own line.
+            line = self.render(
+                self.LINE_TEMPLATE % (time_markup, level_prefix, module_markup, message)
             )
-            self.console.print(output, markup=True, highlight=False)
         except Exception:
+            # getMessage() raises on mismatched %-args and render() on bad rich_markup;
+            # emit() must never propagate.
             self.handleError(record)
+            return
+        self._buffer.append(line)
+        if len(self._buffer) >= self.BUFFER_LIMIT or record.levelno >= WARNING:
+            self._write_buffer(record)
+
+    def render(self, output: str) -> Text:
+        return self.console.render_str(output, markup=True, highlight=False)
+
+    def write(self, lines: list) -> None:
+        self.console.print(*lines, sep="\n", highlight=False)
+
+    def _write_buffer(self, record: logging.LogRecord = None) -> None:
+        if not self._buffer:
+            return
+        lines = self._buffer
+        self._buffer = []
+        # The terminal/pipe write is the only part that fails at runtime (closed or broken stream).
+        try:
+            self.write(lines)
+        except Exception:
+            if record is not None:
+                self.handleError(record)
+            elif logging.raiseExceptions:
+                # Called from flush()/atexit without a record; mirror handleError's report.
+                traceback.print_exc(file=sys.stderr)
+
+    def flush(self) -> None:
+        """Render any buffered lines: on WARNING+, a full buffer, an idle LogListener, and exit."""
+        self.acquire()
+        try:
+            self._write_buffer()
+        finally:
+            self.release()
+
+
+class PlainLogHandler(LegacyRichHandler):
+    """Write the same log lines without Rich markup when output is not a terminal.
+
+    Rich would strip the styling anyway (CI logs, redirected output), so skip its
+    markup parsing and segment rendering and write straight to the console's file.
+    """
+
+    __slots__ = ()
+
+    TIME_TEMPLATE = "%s"
+    MODULE_TEMPLATE = "%s:%d - "
+
+    def _level_prefix(self, levelno: int, levelname: str) -> str:
+        return f"[{levelname}] " + " " * max(0, 8 - len(levelname))
+
+    def format_message(self, record: logging.LogRecord) -> str:
+        base_message = self.base_message(record)
+        if record.rich_markup:
+            return Text.from_markup(base_message).plain
+        return base_message
+
+    def render(self, output: str) -> str:
+        return output
+
+    def write(self, lines: list) -> None:
+        stream = self.console.file
+        stream.write("\n".join(lines) + "\n")
+        stream.flush()
+
+
+class LogListener(QueueListener):
+    """QueueListener that flushes its handlers when idle and can be drained on demand."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._drain_lock = threading.Lock()
+
+    def handle(self, record: logging.LogRecord) -> None:
+        super().handle(record)
+        # Handlers batch lines only while records keep arriving; once the queue is idle,
+        # write them out so nothing waits on a later burst, a WARNING or exit.
+        if self.queue.empty():
+            for handler in self.handlers:
+                handler.flush()
+
+    def stop(self) -> None:
+        # Python < 3.12 raises if stop() runs twice (e.g. drain() then atexit).
+        if self._thread is not None:
+            super().stop()
+
+    def drain(self) -> None:
+        """Block until every queued record is handled, then flush the handlers."""
+        with self._drain_lock:
+            if self._thread is not None:
+                # stop() enqueues a sentinel and joins the worker once the queue is empty.
+                self.stop()
+                self.start()
+            for handler in self.handlers:
+                handler.flush()
 
 
 def initLogger():
-    console = Console(color_system="standard", soft_wrap=True)
-    handler = LegacyRichHandler(console=console)
+    logging.setLogRecordFactory(AutoshiftLogRecord)
+    # Only the Rich path parses markup; emoji codes and auto-highlighting are never wanted.
+    console = Console(
+        color_system="standard", soft_wrap=True, emoji=False, highlight=False
+    )
+    handler_cls = LegacyRichHandler if console.is_terminal else PlainLogHandler
+    handler = handler_cls(console=console)
+
+    # Callers only enqueue records; rendering and terminal writes happen on the listener thread.
+    queue_handler = QueueHandler(queue.SimpleQueue())
+    listener = LogListener(queue_handler.queue, handler, respect_handler_level=True)
+    queue_handler.listener = listener
+    listener.start()
+    atexit.register(listener.stop)
 
     logger = logging.getLogger("autoshift")
     logger.handlers = []
-    logger.addHandler(handler)
+    logger.addHandler(queue_handler)
     logger.setLevel(INFO)
     logger.propagate = False
     return logger
 
 
+def debug_lazy(fn, *args, logger: logging.Logger = None, **kwargs) -> None:
+    """Log ``fn(*args, **kwargs)`` at DEBUG, calling ``fn`` only when DEBUG is enabled.
+
+    Ordinary call sites pass arguments to the logger rather than pre-formatting
+    (``_L.debug("Parsed %s", value)``, not f-strings or ``+``) so filtered records never
+    build their message; use this for arguments that are costly to compute, e.g.
+    ``debug_lazy(json.dumps, obj, indent=2)``.
+    """
+    logger = logger or _L
+    if logger.isEnabledFor(DEBUG):
+        logger.debug("%s", fn(*args, **kwargs), stacklevel=2)
+
+
+def flush_logs(logger: logging.Logger = None) -> None:
+    """Write out queued and buffered log lines, e.g. before writing to stdout with print()."""
+    for handler in (logger or _L).handlers:
+        listener = getattr(handler, "listener", None)
+        if listener is not None:
+            listener.drain()
+        else:
+            handler.flush()
+
+
 _L = initLogger()
@@ -1,12 +1,27 @@
 import os
 import argparse
+import base64
+import hashlib
 import json
 from datetime import datetime, timezone, timedelta
+from functools import lru_cache
 from os import path
 import re as _re
+import shutil
+import sys
 
 from github import Github, InputGitTreeElement
-from github.GithubException import GithubException, UnknownObjectException
+from github.GithubException import GithubException
+
+try:
+    import ijson  # optional: only needed for --stream
+except ImportError:  # pragma: no cover - optional dependency
+    ijson = None
+
+try:
+    import orjson  # optional: faster load/save of shiftcodes.json
+except ImportError:  # pragma: no cover - optional dependency
+    orjson = None
 
 # ---- Timezone for Gearbox (CST/CDT with DST) ----
 # WHY: Treat human-entered/website dates as America/Chicago local time,
@@ -24,13 +39,25 @@ SHIFTCODESJSONPATH = os.environ.get("SHIFTCODESJSONPATH", "data/shiftcodes.json"
 # GitHub upload helper
 # -------------------------
 
+def _git_blob_sha(content_bytes):
+    """Return the SHA-1 git assigns to a blob with this content."""
+    return hashlib.sha1(b"blob %d\0" % len(content_bytes) + content_bytes).hexdigest()
+
+
+def _b64(content_bytes):
+    return base64.b64encode(content_bytes).decode("ascii")
+
+
 def upload_shiftfile(filepath, user, repo_name, token, commit_msg=None, branch=None):
     """
     Upload or update the JSON file to GitHub.
 
     - Uses the basename of `filepath` as the destination path in the repo.
     - Creates/updates on the repository's default branch (fallback: 'main').
-    - If the repository is empty, attempts to bootstrap the first commit.
+    - One get_contents() lookup, then update_file() (or create_file() if the file is
+      missing); it stops after the lookup when the branch already holds identical content.
+    - If the repository is empty and create_file() fails, bootstraps the first commit
+      through the Git Data API.
     """
     if not (user and repo_name and token):
         print("GitHub credentials incomplete; skipping upload.")
@@ -39,9 +66,10 @@ def upload_shiftfile(filepath, user, repo_name, token, commit_msg=None, branch=N
     dest_name = path.basename(filepath)  # e.g. "shiftcodes.json"
     commit_msg = commit_msg or f"Update {dest_name} via mark_expired.py"
 
+    # Kept as bytes throughout: create_file()/update_file() base64-encode bytes themselves
+    # and blobs are sent base64-encoded, so the file is never decoded into a str copy.
     with open(filepath, "rb") as f:
         content_bytes = f.read()
-    content_str = content_bytes.decode("utf-8")
 
     try:
         g = Github(token)
@@ -51,46 +79,56 @@ def upload_shiftfile(filepath, user, repo_name, token, commit_msg=None, branch=N
         if branch is None:
             branch = (repo.default_branch or "main")
 
-        # Check if repo is empty (no branches)
-        try:
-            branches = list(repo.get_branches())
-            is_empty = (len(branches) == 0)
-        except GithubException:
-            # Some org repos return 404 for get_branches() before first commit
-            is_empty = True
-
-        if is_empty:
-            # First try the simplest path: Contents API can create the initial commit/branch
-            try:
-                repo.create_file(dest_name, commit_msg, content_str, branch=branch)
-                print(f"Bootstrapped {user}/{repo_name}@{branch} with {dest_name}.")
-                return True
-            except GithubException as e:
-                # Fallback to Git Data API manual bootstrap (blob -> tree -> commit -> ref)
-                try:
-                    blob = repo.create_git_blob(content_str, "utf-8")
-                    element = InputGitTreeElement(
-                        path=dest_name, mode="100644", type="blob", sha=blob.sha
-                    )
-                    tree = repo.create_git_tree([element])
-                    commit = repo.create_git_commit(commit_msg, tree, parents=[])
-                    repo.create_git_ref(ref=f"refs/heads/{branch}", sha=commit.sha)
-                    print(f"Bootstrapped empty repo and added {dest_name} to {user}/{repo_name}@{branch}.")
-                    return True
-                except Exception as inner:
-                    print("GitHub upload failed during empty-repo bootstrap:", inner)
-                    return False
-
-        # Not empty: try update, else create on the selected branch
+        # One Contents API lookup gives the current blob SHA of the file. GitHub answers 404
+        # both when the file is missing and when the repository is still empty (409 is
+        # also seen for empty repos), so either way the file still has to be created.
         try:
             contents = repo.get_contents(dest_name, ref=branch)
-            repo.update_file(contents.path, commit_msg, content_str, contents.sha, branch=branch)
+        except GithubException as e:
+            if e.status not in (404, 409):
+                raise
+            contents = None
+
+        if contents is not None:
+            # Nothing to commit if the branch already holds identical bytes: compare git blob ids.
+            if contents.sha == _git_blob_sha(content_bytes):
+                print(f"{dest_name} in {user}/{repo_name}@{branch} is already up to date; skipping upload.")
+                return True
+            repo.update_file(contents.path, commit_msg, content_bytes, contents.sha, branch=branch)
             print(f"Updated {dest_name} in {user}/{repo_name}@{branch}.")
             return True
-        except UnknownObjectException:
-            repo.create_file(dest_name, commit_msg, content_str, branch=branch)
+
+        # Missing file, or an empty repo: the Contents API can also create the initial commit/branch
+        try:
+            repo.create_file(dest_name, commit_msg, content_bytes, branch=branch)
             print(f"Created {dest_name} in {user}/{repo_name}@{branch}.")
             return True
+        except GithubException as create_error:
+            # Only an empty repo (no branch head yet: 404, or 409 "Git Repository is empty")
+            # gets the Git Data API bootstrap; anything else is a real failure.
+            try:
+                # Newer PyGithub returns a lazy GitRef; reading it sends the request here.
+                repo.get_git_ref(f"heads/{branch}").object.sha
+            except GithubException as e:
+                if e.status not in (404, 409):
+                    raise
+            else:
+                raise create_error
+
+        # Fallback to Git Data API manual bootstrap (blob -> tree -> commit -> ref)
+        try:
+            blob = repo.create_git_blob(_b64(content_bytes), "base64")
+            element = InputGitTreeElement(
+                path=dest_name, mode="100644", type="blob", sha=blob.sha
+            )
+            tree = repo.create_git_tree([element])
+            commit = repo.create_git_commit(commit_msg, tree, parents=[])
+            repo.create_git_ref(ref=f"refs/heads/{branch}", sha=commit.sha)
+            print(f"Bootstrapped empty repo and added {dest_name} to {user}/{repo_name}@{branch}.")
+            return True
+        except Exception as inner:
+            print("GitHub upload failed during empty-repo bootstrap:", inner)
+            return False
 
     except GithubException as e:
         if e.status in (401, 403):
@@ -110,7 +148,7 @@ def upload_shiftfile(filepath, user, repo_name, token, commit_msg=None, branch=N
 # -------------------------
 # I/O helpers
 # -------------------------
-def load_file(fn):
+def _require_file(fn):
     # If the file isn't present, guide the user to generate it first.
     # WHY: Many users rely on the default path (data/shiftcodes.json) which is produced by
     # autoshift_scraper.py. When it's missing, this helper should explicitly tell them to
@@ -122,18 +160,189 @@ def load_file(fn):
             "or pass the correct file path with --file <PATH>."
         )
         raise SystemExit(hint)
+
+
+def load_file(fn):
+    _require_file(fn)
+    if orjson is not None:
+        with open(fn, "rb") as f:
+            raw = f.read()
+        try:
+            return orjson.loads(raw)
+        except orjson.JSONDecodeError:
+            pass  # e.g. integers beyond 64 bits; let json decide (and report errors)
+        return json.loads(raw.decode("utf-8"))
     with open(fn, "r", encoding="utf-8") as f:
         return json.load(f)
 
 
+_JSON_SCALARS = frozenset((str, int, bool, type(None)))
+
+
+def _contains_float(data):
+    """True if any value nested in `data` (dicts/lists/tuples) is a float."""
+    stack = [(data,)]
+    while stack:
+        value = stack.pop()
+        for item in (value.values() if isinstance(value, dict) else value):
+            # Exact-type check first: nearly every value in shiftcodes.json is a plain scalar.
+            if item.__class__ in _JSON_SCALARS:
+                continue
+            if isinstance(item, float):
+                return True
+            if isinstance(item, (dict, list, tuple)):
+                stack.append(item)
+    return False
+
+
+def _dumps_orjson(data):
+    """Serialize like json.dump(indent=2, default=str), or return None to use json.
+
+    orjson formats floats differently (1e16 vs 1e+16, NaN as null), so data holding
+    any float goes straight to json; shiftcodes.json normally has none. It also writes
+    non-ASCII (and DEL) characters raw where json escapes them, so such output falls
+    back too and the file stays byte-identical.
+    """
+    if _contains_float(data):
+        return None
+    try:
+        out = orjson.dumps(
+            data, option=orjson.OPT_INDENT_2 | orjson.OPT_PASSTHROUGH_DATETIME, default=str
+        )
+    except orjson.JSONEncodeError:
+        return None  # e.g. integers beyond 64 bits, non-str keys
+    if not out.isascii() or b"\x7f" in out:
+        return None
+    return out
+
+
+def _replace_file(tmp, fn):
+    """Atomically move `tmp` over `fn`, keeping the original file's permission bits."""
+    if path.exists(fn):
+        shutil.copymode(fn, tmp)
+    os.replace(tmp, fn)
+
+
 def save_file(fn, data):
-    with open(fn, "w", encoding="utf-8") as f:
-        json.dump(data, f, indent=2, default=str)
+    """Write `data` to a temp file next to `fn` and swap it in with os.replace().
+
+    A crash or full disk mid-write leaves the previous file intact instead of a
+    truncated one.
+    """
+    out = _dumps_orjson(data) if orjson is not None else None
+    tmp = fn + ".tmp"
+    try:
+        if out is not None:
+            with open(tmp, "wb") as f:
+                f.write(out)
+        else:
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, indent=2, default=str)
+        _replace_file(tmp, fn)
+    except BaseException:
+        if path.exists(tmp):
+            os.remove(tmp)
+        raise
+
+
+# ---- Streaming I/O (--stream; requires ijson) ----
+
+def _stream_layout(fn):
+    """Return the keys of the container object in `fn` without building the codes list.
+
+    Returns None when the file is valid JSON but not the single-container layout that
+    streaming can rewrite faithfully (callers then fall back to load_file/save_file).
+    Raises SystemExit when there is no container with a "codes" array at all.
+    """
+    _require_file(fn)
+    keys = []
+    codes_is_array = False
+    with open(fn, "rb") as f:
+        events = ijson.parse(f)
+        if next(events, (None, None, None))[1] != "start_array":
+            raise SystemExit("Unexpected shiftcodes.json format")
+        # The first element must be the container object (like data[0] in load_file's
+        # check); a leading scalar/array/empty list would otherwise be skipped and lost.
+        if next(events, (None, None, None))[:2] != ("item", "start_map"):
+            raise SystemExit("Unexpected shiftcodes.json format")
+        # Walk the first container's events (its codes are parsed but never built).
+        for prefix, event, value in events:
+            if prefix == "item" and event == "map_key":
+                keys.append(value)
+            elif prefix == "item.codes" and event == "start_array":
+                codes_is_array = True
+            elif prefix == "item" and event == "end_map":
+                break
+        if "codes" not in keys or not codes_is_array:
+            raise SystemExit("Unexpected shiftcodes.json format")
+        # A second top-level element, or keys ijson cannot address by prefix, need the full path.
+        if next(events, (None, None, None))[:2] != ("", "end_array"):
+            return None
+    if len(set(keys)) != len(keys) or any("." in k for k in keys):
+        return None
+    return keys
+
+
+def _iter_stream(fn, prefix):
+    with open(fn, "rb") as f:
+        yield from ijson.items(f, prefix, use_float=True)
+
+
+def _save_file_streamed(fn, keys, expired_indices):
+    """Rewrite `fn` one code entry at a time, setting expired=True at `expired_indices`.
+
+    Emits the same text as save_file()'s json.dump(indent=2) but never holds the codes
+    list; writes to a temp file and swaps it in once complete.
+    """
+    tmp = fn + ".tmp"
+    try:
+        with open(tmp, "w", encoding="utf-8") as out:
+            out.write("[\n  {")
+            for n, key in enumerate(keys):
+                out.write(("," if n else "") + "\n    " + json.dumps(key) + ": ")
+                if key != "codes":
+                    value = next(_iter_stream(fn, "item." + key))
+                    out.write(json.dumps(value, indent=2, default=str).replace("\n", "\n    "))
+                    continue
+                out.write("[")
+                i = -1
+                for i, e in enumerate(_iter_stream(fn, "item.codes.item")):
+                    if i in expired_indices:
+                        e["expired"] = True
+                    entry = json.dumps(e, indent=2, default=str).replace("\n", "\n      ")
+                    out.write(("," if i else "") + "\n      " + entry)
+                out.write("\n    ]" if i >= 0 else "]")
+            out.write("\n  }\n]")
+        _replace_file(tmp, fn)
+    except BaseException:
+        if path.exists(tmp):
+            os.remove(tmp)
+        raise
 
 
 # -------------------------
 # Time helpers
 # -------------------------
+_HAS_FAST_ISO = sys.version_info >= (3, 11)
+
+
+def _fromisoformat_compat(s):
+    """fromisoformat() with the normalisation older Pythons need; None if unparsable."""
+    # Normalize trailing 'Z' to +00:00 for fromisoformat
+    if s.endswith(("Z", "z")):
+        s = s[:-1] + "+00:00"
+    # Try direct parse
+    try:
+        return datetime.fromisoformat(s)
+    except ValueError:
+        # Retry with space->'T' if needed
+        try:
+            s2 = s.replace(" ", "T", 1)
+            return datetime.fromisoformat(s2)
+        except Exception:
+            return None
+
+
 def parse_iso_to_utc(value):
     """Parse an ISO-8601-like string into an aware UTC datetime.
 
@@ -147,18 +356,16 @@ def parse_iso_to_utc(value):
         s = value.strip()
         if not s or s.lower() == "unknown":
             return None
-        # Normalize trailing 'Z' to +00:00 for fromisoformat
-        if s.endswith(("Z", "z")):
-            s = s[:-1] + "+00:00"
-        # Try direct parse
-        try:
-            dt = datetime.fromisoformat(s)
-        except ValueError:
-            # Retry with space->'T' if needed
+        dt = None
+        if _HAS_FAST_ISO:
+            # 3.11+ fromisoformat() takes 'Z' and most ISO-8601 forms as-is
             try:
-                s2 = s.replace(" ", "T", 1)
-                dt = datetime.fromisoformat(s2)
-            except Exception:
+                dt = datetime.fromisoformat(s)
+            except ValueError:
+                pass
+        if dt is None:
+            dt = _fromisoformat_compat(s)
+            if dt is None:
                 return None
         # If naive, treat as America/Chicago local time (CST/CDT)
         if dt.tzinfo is None:
@@ -168,16 +375,22 @@ def parse_iso_to_utc(value):
 
 # ---- Flexible expiry parsing (supports common non-ISO formats) ----
 
+# Compiled once at import; bulk sweeps run these for every entry.
+_ORDINAL_RE = _re.compile(r"\b(\d{1,2})(st|nd|rd|th)\b", _re.IGNORECASE)
+_UTC_RE = _re.compile(r"\s*UTC\b", _re.IGNORECASE)
+_WS_RE = _re.compile(r"\s+")
+_SLASH_RE = _re.compile(r"(\d{1,2})/(\d{1,2})/(\d{2,4})")
+# Naive ISO date, optionally with a seconds-resolution time: "2025-09-28", "2025-09-28 00:00:00"
+_ISO_LOCAL_RE = _re.compile(r"(\d{4})-(\d{2})-(\d{2})(?:[ T](\d{2}):(\d{2}):(\d{2}))?")
+
 def _normalize_date_string(s: str) -> str:
     s = s.strip()
     # Remove ordinal suffixes: 1st, 2nd, 3rd, 4th -> 1,2,3,4
-    s = _re.sub(r"\b(\d{1,2})(st|nd|rd|th)\b", lambda m: m.group(1), s, flags=_re.IGNORECASE)
-    # Normalize 'Sept' to 'Sep' for %b parsing
-    s = _re.sub(r"\bSept\b", "Sep", s, flags=_re.IGNORECASE)
+    s = _ORDINAL_RE.sub(r"\1", s)
     # Remove trailing 'UTC' token (we assume UTC anyway)
-    s = _re.sub(r"\s*UTC\b", "", s, flags=_re.IGNORECASE)
+    s = _UTC_RE.sub("", s)
     # Collapse multiple spaces
-    s = _re.sub(r"\s+", " ", s)
+    s = _WS_RE.sub(" ", s)
     return s.strip()
 
 
@@ -187,7 +400,7 @@ def _parse_numeric_slash(s: str):
     Interpret as midnight in America/Chicago, then convert to UTC.
     Returns aware UTC datetime, or None.
     """
-    m = _re.fullmatch(r"(\d{1,2})/(\d{1,2})/(\d{2,4})", s)
+    m = _SLASH_RE.fullmatch(s)
     if not m:
         return None
     a, b, y = m.groups()
@@ -204,29 +417,68 @@ def _parse_numeric_slash(s: str):
     except Exception:
         return None
 
-def _try_strptime_formats(s: str):
-    """Try common formats. Treat naive results as America/Chicago, then convert to UTC.
-    Returns aware UTC datetime (year may be 1900 for month/day-only), or None.
+# English month abbreviations and full names (matched case-insensitively), plus the
+# common "Sept"; looked up directly, so parsing never depends on the process locale.
+_MONTHS = {
+    "jan": 1, "january": 1, "feb": 2, "february": 2, "mar": 3, "march": 3,
+    "apr": 4, "april": 4, "may": 5, "jun": 6, "june": 6, "jul": 7, "july": 7,
+    "aug": 8, "august": 8, "sep": 9, "sept": 9, "september": 9, "oct": 10,
+    "october": 10, "nov": 11, "november": 11, "dec": 12, "december": 12,
+}
+_MONTH_ALT = "|".join(sorted(_MONTHS, key=len, reverse=True))
+# One fullmatch per shape replaces the old strptime format loop; inputs are already
+# normalised (single spaces, no ordinals/UTC suffix).
+#   "Sep 28, 2025" / "Sep 28 2025" / "Sep 28" (month/day only)
+_MONTH_DAY_RE = _re.compile(
+    rf"(?P<mon>{_MONTH_ALT}) (?P<d>\d{{1,2}})(?:,? (?P<y>\d{{4}}))?", _re.IGNORECASE
+)
+#   "Sep 28, 2025 10:30 PM" (12h clock; the comma is required)
+_MONTH_DAY_TIME_RE = _re.compile(
+    rf"(?P<mon>{_MONTH_ALT}) (?P<d>\d{{1,2}}), (?P<y>\d{{4}}) "
+    r"(?P<h>\d{1,2}):(?P<mi>\d{1,2}) (?P<ap>AM|PM)",
+    _re.IGNORECASE,
+)
+#   "28 Sep 2025"
+_DAY_MONTH_RE = _re.compile(
+    rf"(?P<d>\d{{1,2}}) (?P<mon>{_MONTH_ALT}) (?P<y>\d{{4}})", _re.IGNORECASE
+)
+#   "2025-9-28" (ISO-ish with unpadded fields, e.g. after stripping a UTC suffix)
+_YMD_RE = _re.compile(r"(?P<y>\d{4})-(?P<m>\d{1,2})-(?P<d>\d{1,2})")
+
+def _parse_common_formats(s: str):
+    """Parse named-month and Y-M-D dates. Treat them as America/Chicago, then convert to UTC.
+    Returns aware UTC datetime (year is 1900 for month/day-only, as strptime did), or None.
     """
-    fmts = [
-        # With year
-        "%b %d, %Y", "%B %d, %Y", "%b %d %Y", "%B %d %Y",
-        "%d %b %Y", "%d %B %Y",
-        "%Y-%m-%d",
-        # With time (12h)
-        "%b %d, %Y %I:%M %p", "%B %d, %Y %I:%M %p",
-        # Month-day only (year will be 1900)
-        "%b %d", "%B %d",
-    ]
-    for fmt in fmts:
-        try:
-            dt = datetime.strptime(s, fmt)
-            if dt.tzinfo is None:
-                dt = dt.replace(tzinfo=GEARBOX_TZ)
-            return dt.astimezone(timezone.utc)
-        except Exception:
-            pass
-    return None
+    hour = minute = 0
+    m = _MONTH_DAY_RE.fullmatch(s) or _DAY_MONTH_RE.fullmatch(s)
+    if m is not None:
+        month = _MONTHS[m.group("mon").lower()]
+        year = m.group("y")
+    else:
+        m = _MONTH_DAY_TIME_RE.fullmatch(s)
+        if m is not None:
+            month = _MONTHS[m.group("mon").lower()]
+            year = m.group("y")
+            hour = int(m.group("h"))
+            minute = int(m.group("mi"))
+            if not 1 <= hour <= 12:
+                return None
+            # 12h -> 24h: 12 AM is midnight, 12 PM is noon
+            hour = hour % 12 + (12 if m.group("ap").upper() == "PM" else 0)
+        else:
+            m = _YMD_RE.fullmatch(s)
+            if m is None:
+                return None
+            month = int(m.group("m"))
+            year = m.group("y")
+    try:
+        local_dt = datetime(
+            int(year) if year else 1900, month, int(m.group("d")), hour, minute,
+            tzinfo=GEARBOX_TZ,
+        )
+    except ValueError:
+        return None
+    return local_dt.astimezone(timezone.utc)
 
 def _choose_year_for_monthday(dt_like: datetime, ref_dt: datetime, archived_dt):
     """Given a month/day-only datetime (year=1900), choose a plausible year based on archived/ref.
@@ -252,6 +504,73 @@ def _choose_year_for_monthday(dt_like: datetime, ref_dt: datetime, archived_dt):
             pass
     return candidate_local.astimezone(timezone.utc)
 
+
+# parse_expiry_absolute() result kinds
+EXPIRY_ABSOLUTE = "absolute"
+EXPIRY_NEEDS_YEAR = "needs_year"
+
+
+@lru_cache(maxsize=4096)
+def parse_expiry_absolute(s: str):
+    """Parse the part of an 'expires' string that does not depend on ref/archived dates.
+
+    `s` should already be stripped. Returns (kind, dt_utc): EXPIRY_NEEDS_YEAR for
+    month/day-only strings, whose dt_utc carries a 1900 placeholder year (see
+    parse_expiry_relative()), otherwise EXPIRY_ABSOLUTE with dt_utc None when
+    unparsable. The result only depends on `s`, so it is memoised across sweeps and
+    reference times.
+    """
+    # NAIVE ISO (YYYY-MM-DD, optionally HH:MM:SS) -> America/Chicago (midnight if no time),
+    # then to UTC. Built straight from the match groups; skips the generic ISO/normalise path.
+    m = _ISO_LOCAL_RE.fullmatch(s)
+    if m is not None:
+        try:
+            local_dt = datetime(*(int(g) for g in m.groups() if g is not None), tzinfo=GEARBOX_TZ)
+            return EXPIRY_ABSOLUTE, local_dt.astimezone(timezone.utc)
+        except ValueError:
+            return EXPIRY_ABSOLUTE, None
+
+    # Full ISO (with time and maybe offset) -> use strict ISO path
+    iso = parse_iso_to_utc(s)
+    if iso is not None:
+        return EXPIRY_ABSOLUTE, iso
+
+    s_norm = _normalize_date_string(s)
+
+    # Numeric slash formats (mm/dd/yyyy or dd/mm/yyyy)
+    dt = _parse_numeric_slash(s_norm)
+    if dt is not None:
+        return EXPIRY_ABSOLUTE, dt
+
+    # Try common named-month formats
+    dt2 = _parse_common_formats(s_norm)
+    if dt2 is not None:
+        # Month/day only came back as UTC for a 1900 placeholder; caller picks the year
+        return (EXPIRY_NEEDS_YEAR if dt2.year == 1900 else EXPIRY_ABSOLUTE), dt2
+
+    return EXPIRY_ABSOLUTE, None
+
+
+def parse_expiry_relative(s: str, ref_dt: datetime, archived_value):
+    """Parse a stripped 'expires' string, choosing a year for month/day-only values.
+
+    Only EXPIRY_NEEDS_YEAR results look at ref_dt/archived_value; everything else is
+    the cached parse_expiry_absolute() value. Returns an aware UTC datetime or None.
+    """
+    kind, dt = parse_expiry_absolute(s)
+    if kind == EXPIRY_NEEDS_YEAR:
+        # Pick a plausible year in Central based on the archived/reference date
+        arch_dt = parse_iso_to_utc(archived_value) if archived_value else None
+        dt = _choose_year_for_monthday(dt, ref_dt, arch_dt)
+    return dt
+
+
+# _classify_raw() states
+_EXPIRES_MISSING = "missing"
+_EXPIRES_UNKNOWN = "unknown"
+_EXPIRES_PARSED = "parsed"
+
+
 def parse_expiry_to_utc(value, ref_dt: datetime, archived_value):
     """Parse an 'expires' string into aware UTC datetime.
 
@@ -260,51 +579,44 @@ def parse_expiry_to_utc(value, ref_dt: datetime, archived_value):
     (YYYY-MM-DD), also treat as Central midnight.
     Returns None on missing/empty/"Unknown"/unparsable.
     """
-    if value is None:
-        return None
-    if isinstance(value, str):
-        s = value.strip()
-        if not s or s.lower() == "unknown":
-            return None
+    state, dt = _classify_raw(value, ref_dt, archived_value)
+    return dt if state == _EXPIRES_PARSED else None
 
-        # DATE-ONLY ISO (YYYY-MM-DD) -> treat as midnight America/Chicago, then to UTC
-        if _re.fullmatch(r"\d{4}-\d{2}-\d{2}", s):
-            try:
-                y, m, d = map(int, s.split("-"))
-                local_dt = datetime(y, m, d, tzinfo=GEARBOX_TZ)
-                return local_dt.astimezone(timezone.utc)
-            except Exception:
-                return None
 
-        # Full ISO (with time and maybe offset) -> use strict ISO path
-        iso = parse_iso_to_utc(s)
-        if iso is not None:
-            return iso
+def _classify_raw(raw, ref_dt: datetime, archived_value):
+    """Classify a raw 'expires' value, stripping it only once.
 
-        s_norm = _normalize_date_string(s)
+    Returns (state, dt): (_EXPIRES_MISSING, None) for None/empty, (_EXPIRES_UNKNOWN, None)
+    for "Unknown", otherwise (_EXPIRES_PARSED, dt) where dt is the aware UTC datetime or
+    None if the value could not be parsed.
+    """
+    if raw is None:
+        return _EXPIRES_MISSING, None
+    if not isinstance(raw, str):
+        return _EXPIRES_PARSED, None
+    s = raw.strip()
+    if not s:
+        return _EXPIRES_MISSING, None
+    if s.lower() == "unknown":
+        return _EXPIRES_UNKNOWN, None
 
-        # Numeric slash formats (mm/dd/yyyy or dd/mm/yyyy)
-        dt = _parse_numeric_slash(s_norm)
-        if dt is not None:
-            return dt
+    return _EXPIRES_PARSED, parse_expiry_relative(s, ref_dt, archived_value)
 
-        # Try common named-month formats
-        dt2 = _try_strptime_formats(s_norm)
-        if dt2 is not None:
-            # Month/day only came back as UTC for a 1900 placeholder; pick a plausible year in Central
-            if dt2.year == 1900:
-                arch_dt = parse_iso_to_utc(archived_value) if archived_value else None
-                return _choose_year_for_monthday(dt2, ref_dt, arch_dt)
-            return dt2  # already UTC
 
-    return None
-    
 def format_central_with_offset(dt_utc: datetime) -> str:
     """
     Format a UTC datetime as America/Chicago local time with the correct UTC offset label.
     Example: 'Sep 28, 2025, 02:11 AM UTC-05:00' (CDT) or 'UTC-06:00' (CST).
     """
-    local = dt_utc.astimezone(GEARBOX_TZ)
+    # Cached per whole UTC second: the label drops seconds, and zone offsets are whole
+    # seconds (pre-1883 LMT is -5:50:36, so minute buckets could shift the shown minute).
+    return _format_central_second(int(dt_utc.timestamp() // 1))
+
+_EPOCH_UTC = datetime(1970, 1, 1, tzinfo=timezone.utc)
+
+@lru_cache(maxsize=2048)
+def _format_central_second(epoch_second: int) -> str:
+    local = (_EPOCH_UTC + timedelta(seconds=epoch_second)).astimezone(GEARBOX_TZ)
     off = local.utcoffset() or timedelta(0)
     total_minutes = int(off.total_seconds() // 60)
     sign = "-" if total_minutes < 0 else "+"
@@ -315,10 +627,14 @@ def format_central_with_offset(dt_utc: datetime) -> str:
 # -------------------------
 # Core operations (bulk)
 # -------------------------
-def sweep_expired_by_timestamp(filepath, ref_dt, dry_run=False):
+def sweep_expired_by_timestamp(filepath, ref_dt, dry_run=False, stream=False):
     """Bulk mode: set expired=True for entries with valid expires < ref_dt.
     Does not modify 'expires' values.
 
+    With stream=True (requires ijson) entries are read one at a time and, if anything
+    changed, the file is rewritten entry by entry, so the codes list is never held in
+    memory. Files that don't have the usual single-container layout use the normal path.
+
     Returns (changed, stats_dict, details_list).
 
     details_list items:
@@ -328,49 +644,51 @@ def sweep_expired_by_timestamp(filepath, ref_dt, dry_run=False):
         "will_set": "YES" | "NO" | "NA",  # YES if dt < ref_dt; NO if dt >= ref_dt; NA for Unknown/empty/invalid
       }
     """
-    data = load_file(filepath)
-    if not data or not isinstance(data, list) or not isinstance(data[0], dict) or "codes" not in data[0]:
-        raise SystemExit("Unexpected shiftcodes.json format")
+    stream_keys = _stream_layout(filepath) if stream else None
+    if stream_keys is not None:
+        data = None
+        entries = _iter_stream(filepath, "item.codes.item")
+    else:
+        data = load_file(filepath)
+        if not data or not isinstance(data, list) or not isinstance(data[0], dict) or "codes" not in data[0]:
+            raise SystemExit("Unexpected shiftcodes.json format")
+        entries = data[0]["codes"]
 
-    entries = data[0]["codes"]
     scanned = 0
     set_expired = 0
     skipped_unknown = 0
     unparsable = 0
 
     details = []
+    expired_indices = set()  # only used to rewrite a streamed file
 
-    for e in entries:
+    for idx, e in enumerate(entries):
         scanned += 1
         code_str = (e.get("code") or "").strip()
-        raw = e.get("expires")
+        state, dt = _classify_raw(e.get("expires"), ref_dt, e.get("archived"))
 
         expires_disp = "Not Found"
         will_set = "NA"
 
-        if raw is None or (isinstance(raw, str) and raw.strip() == ""):
+        if state == _EXPIRES_MISSING:
             skipped_unknown += 1
-            expires_disp = "Not Found"
-            will_set = "NA"
-        elif isinstance(raw, str) and raw.strip().lower() == "unknown":
+        elif state == _EXPIRES_UNKNOWN:
             skipped_unknown += 1
             expires_disp = "Unknown"
-            will_set = "NA"
+        elif dt is None:
+            unparsable += 1
         else:
-            dt = parse_expiry_to_utc(raw, ref_dt, e.get("archived"))
-            if dt is None:
-                unparsable += 1
-                expires_disp = "Not Found"
-                will_set = "NA"
-            else:
-                dt_utc = dt.astimezone(timezone.utc)
-                expires_disp = format_central_with_offset(dt_utc)
-                will_set = "YES" if dt_utc < ref_dt else "NO"
-                if dt_utc < ref_dt and e.get("expired") is not True:
-                    set_expired += 1
-                    # Don't mutate the JSON during dry-run; only count what would change.
-                    if not dry_run:
-                        e["expired"] = True
+            # _classify_raw() already returns UTC; comparing datetimes that share
+            # timezone.utc skips the per-entry offset arithmetic.
+            is_past = dt < ref_dt
+            expires_disp = format_central_with_offset(dt)
+            will_set = "YES" if is_past else "NO"
+            if is_past and e.get("expired") is not True:
+                set_expired += 1
+                # Don't mutate the JSON during dry-run; only count what would change.
+                if not dry_run:
+                    e["expired"] = True
+                    expired_indices.add(idx)
 
         details.append({
             "code": code_str,
@@ -380,7 +698,10 @@ def sweep_expired_by_timestamp(filepath, ref_dt, dry_run=False):
 
     changed = set_expired > 0
     if changed and not dry_run:
-        save_file(filepath, data)
+        if stream_keys is not None:
+            _save_file_streamed(filepath, stream_keys, expired_indices)
+        else:
+            save_file(filepath, data)
 
     return changed, {
         "scanned": scanned,
@@ -422,35 +743,43 @@ def targeted_update_codes(codes, filepath, ref_dt, provided_expires, dry_run=Fal
     set_expires = 0  # count how many entries have their 'expires' set/overwritten
 
     details = []
-    unmatched = set(target_set)
 
     stamp_iso = ref_dt.isoformat()
     stamp_pretty = format_central_with_offset(ref_dt)
 
-    for e in entries:
-        code_val = (e.get("code") or "").strip().upper()
-        if code_val not in target_set:
-            continue
+    # Index entries by code once, then look up only the requested codes. A code can
+    # appear more than once in the file, so keep every index and visit them in file order.
+    by_code = {}
+    for idx, e in enumerate(entries):
+        by_code.setdefault((e.get("code") or "").strip().upper(), []).append(idx)
+
+    unmatched = set()
+    matches = []
+    for tgt in target_set:
+        indices = by_code.get(tgt)
+        if indices is None:
+            unmatched.add(tgt)
+        else:
+            matches.extend((idx, tgt) for idx in indices)
+    matches.sort()
 
-        # It's a match
-        unmatched.discard(code_val)
+    for idx, code_val in matches:
+        e = entries[idx]
         scanned += 1
 
-        raw = e.get("expires")
         # Classify the existing expires for summary counts
-        if raw is None or (isinstance(raw, str) and raw.strip() == ""):
+        state, dt = _classify_raw(e.get("expires"), ref_dt, e.get("archived"))
+        if state == _EXPIRES_MISSING:
             skipped_unknown += 1
             expires_disp_current = "Not Found"
-        elif isinstance(raw, str) and raw.strip().lower() == "unknown":
+        elif state == _EXPIRES_UNKNOWN:
             skipped_unknown += 1
             expires_disp_current = "Unknown"
+        elif dt is None:
+            unparsable += 1
+            expires_disp_current = "Not Found"
         else:
-            dt = parse_expiry_to_utc(raw, ref_dt, e.get("archived"))
-            if dt is None:
-                unparsable += 1
-                expires_disp_current = "Not Found"
-            else:
-                expires_disp_current = format_central_with_offset(dt)
+            expires_disp_current = format_central_with_offset(dt)
 
         # Decide what we'd do
         if provided_expires:
@@ -464,15 +793,13 @@ def targeted_update_codes(codes, filepath, ref_dt, provided_expires, dry_run=Fal
             will_set = "YES"
             # We'll set both expires and expired
             set_expires += 1
+            # Count the transition in both modes (dry-run reports what WOULD be set)
+            was_expired = e.get("expired") is True
+            if not was_expired:
+                set_expired += 1
             if not dry_run:
                 e["expires"] = stamp_iso
-                if e.get("expired") is not True:
-                    set_expired += 1
                 e["expired"] = True
-            else:
-                # Even in dry-run, count what WOULD be set expired (for totals)
-                if e.get("expired") is not True:
-                    set_expired += 1
 
         details.append({
             "code": code_val,
@@ -500,147 +827,113 @@ def targeted_update_codes(codes, filepath, ref_dt, provided_expires, dry_run=Fal
 # Printing helpers (shared by dry-run and real runs)
 # -------------------------
 
-def _build_separator(all_lines):
-    longest = max((len(s) for s in all_lines), default=8)
-    return "-" * max(longest, 8)
+class _LineBuf:
+    """Report lines plus the running width of the longest one.
+
+    Separators are sized to the longest printed line, which is only known once the
+    report is complete; add_sep() leaves a placeholder that render() fills in.
+    """
 
+    __slots__ = ("lines", "max_len")
 
-def print_targeted_report(details, stats, ref_dt, provided_expires, unmatched, is_dry_run):
+    def __init__(self):
+        self.lines = []
+        self.max_len = 0
+
+    def append(self, line):
+        if len(line) > self.max_len:
+            self.max_len = len(line)
+        self.lines.append(line)
+
+    def extend(self, lines):
+        for line in lines:
+            self.append(line)
+
+    def add_sep(self):
+        self.lines.append(None)
+
+    def render(self):
+        sep = "-" * max(self.max_len, 8)
+        return "\n".join(sep if line is None else line for line in self.lines) + "\n"
+
+
+def _report_header(buf, ref_dt, is_dry_run):
     # Header: only include the literal "DRY-RUN:" label when --dry-run is used
-    header = []
     if is_dry_run:
-        header.append("DRY-RUN:")
-    header.append(f"Date & Time (ISO): {ref_dt.isoformat()} | {format_central_with_offset(ref_dt)}")
+        buf.append("DRY-RUN:")
+    buf.append(f"Date & Time (ISO): {ref_dt.isoformat()} | {format_central_with_offset(ref_dt)}")
 
-    # Per-code lines
-    per_code_lines = []
-    for d in details:
-        per_code_lines.append(f"Code: {d['code']}")
-        # In print_targeted_report(...)
-        # When *setting* expiry (no --expires), show the exact stamp being written:
-        if provided_expires:
-            # keep existing behavior when user supplies --expires:
-            exp_to_show = d['new_expires_display']
-        else:
-            # targeted mode without --expires: show ISO | Central pair for ref_dt
-            exp_to_show = f"{ref_dt.isoformat()} | {format_central_with_offset(ref_dt)}"
-            
-        per_code_lines.append(f"Expires: {exp_to_show}")
-        per_code_lines.append(f"Will Set Expired: {d['will_set']}")
 
+def _report_summary(buf, stats):
     # Summary (always printed in both dry-run and real runs)
-    summary = [
+    buf.extend((
         f"Scanned: {stats['scanned']}",
         f"Set expired: {stats['set_expired']}",
         f"Set expires field: {stats.get('set_expires', 0)}",
         f"Skipped (expires missing/empty or 'Unknown'): {stats['skipped_unknown']}",
         f"Unparsable (invalid 'expires' timestamp): {stats['unparsable']}",
-    ]
-    if stats.get("updated_expires_only", 0) > 0:
-        summary.append(f"Updated expires only: {stats['updated_expires_only']}")
+    ))
+
 
+def _report_notes(buf, is_dry_run):
     # Notes (printed ONLY in dry-run)
-    notes = [
-        "Notes:",
-        "- 'Skipped' looks only at the 'expires' field (missing, empty, or 'Unknown').",
-        "- 'Unparsable' means the 'expires' field could not be parsed as an ISO or common date format.",
-    ]
+    if is_dry_run:
+        buf.add_sep()
+        buf.extend((
+            "Notes:",
+            "- 'Skipped' looks only at the 'expires' field (missing, empty, or 'Unknown').",
+            "- 'Unparsable' means the 'expires' field could not be parsed as an ISO or common date format.",
+        ))
 
-    # Unmatched codes (always shown if any)
-    unmatched_lines = [f"No matches found for {code}" for code in unmatched]
 
-    # Build separator based on what will actually be printed
-    sep_basis = header + per_code_lines + summary + unmatched_lines
-    if is_dry_run:
-        sep_basis += notes
-    sep = _build_separator(sep_basis)
-
-    # Print header
-    print("\n".join(header))
-
-    # Print per-code blocks (if any), with separators between blocks
-    blocks = [per_code_lines[i:i+3] for i in range(0, len(per_code_lines), 3)]
-    print(sep)
-    if blocks:
-        for idx, block in enumerate(blocks):
-            for line in block:
-                print(line)
-            if idx < len(blocks) - 1:
-                print(sep)
-        print(sep)
-
-    # Summary (always)
-    print("\n".join(summary))
-
-    # Notes (dry-run only)
-    if is_dry_run:
-        print(sep)
-        print("\n".join(notes))
+def print_targeted_report(details, stats, ref_dt, provided_expires, unmatched, is_dry_run):
+    buf = _LineBuf()
+    _report_header(buf, ref_dt, is_dry_run)
+
+    if not provided_expires:
+        # targeted mode without --expires: show ISO | Central pair for ref_dt
+        stamp_display = f"{ref_dt.isoformat()} | {format_central_with_offset(ref_dt)}"
 
-    # Unmatched codes (if any)
-    if unmatched_lines:
-        print(sep)
-        for line in unmatched_lines:
-            print(line)
+    # Per-code blocks (if any), with separators between blocks
+    buf.add_sep()
+    for d in details:
+        buf.append(f"Code: {d['code']}")
+        # When *setting* expiry (no --expires), show the exact stamp being written;
+        # keep existing behavior when user supplies --expires.
+        exp_to_show = d['new_expires_display'] if provided_expires else stamp_display
+        buf.append(f"Expires: {exp_to_show}")
+        buf.append(f"Will Set Expired: {d['will_set']}")
+        buf.add_sep()
+
+    _report_summary(buf, stats)
+    if stats.get("updated_expires_only", 0) > 0:
+        buf.append(f"Updated expires only: {stats['updated_expires_only']}")
+    _report_notes(buf, is_dry_run)
+
+    # Unmatched codes (always shown if any)
+    if unmatched:
+        buf.add_sep()
+        buf.extend(f"No matches found for {code}" for code in unmatched)
+
+    sys.stdout.write(buf.render())
 
 
 def print_bulk_report(details, stats, ref_dt, is_dry_run):
-    # Header: only include the literal "DRY-RUN:" label when --dry-run is used
-    header = []
-    if is_dry_run:
-        header.append("DRY-RUN:")
-    header.append(f"Date & Time (ISO): {ref_dt.isoformat()} | {format_central_with_offset(ref_dt)}")
+    buf = _LineBuf()
+    _report_header(buf, ref_dt, is_dry_run)
 
-    # Per-code lines
-    per_code_lines = []
+    # Per-code blocks (if any), with separators between blocks
+    buf.add_sep()
     for d in details:
-        per_code_lines.append(f"Code: {d['code']}")
-        per_code_lines.append(f"Expires: {d['expires_display']}")
-        per_code_lines.append(f"Will Set Expired: {d['will_set']}")
+        buf.append(f"Code: {d['code']}")
+        buf.append(f"Expires: {d['expires_display']}")
+        buf.append(f"Will Set Expired: {d['will_set']}")
+        buf.add_sep()
 
-    # Summary (always printed in both dry-run and real runs)
-    summary = [
-        f"Scanned: {stats['scanned']}",
-        f"Set expired: {stats['set_expired']}",
-        f"Set expires field: {stats.get('set_expires', 0)}",
-        f"Skipped (expires missing/empty or 'Unknown'): {stats['skipped_unknown']}",
-        f"Unparsable (invalid 'expires' timestamp): {stats['unparsable']}",
-    ]
+    _report_summary(buf, stats)
+    _report_notes(buf, is_dry_run)
 
-    # Notes (printed ONLY in dry-run)
-    notes = [
-        "Notes:",
-        "- 'Skipped' looks only at the 'expires' field (missing, empty, or 'Unknown').",
-        "- 'Unparsable' means the 'expires' field could not be parsed as an ISO or common date format.",
-    ]
-
-    # Build separator based on what will actually be printed
-    sep_basis = header + per_code_lines + summary
-    if is_dry_run:
-        sep_basis += notes
-    sep = _build_separator(sep_basis)
-
-    # Print header
-    print("\n".join(header))
-
-    # Print per-code blocks (if any), with separators between blocks
-    blocks = [per_code_lines[i:i+3] for i in range(0, len(per_code_lines), 3)]
-    print(sep)
-    if blocks:
-        for idx, block in enumerate(blocks):
-            for line in block:
-                print(line)
-            if idx < len(blocks) - 1:
-                print(sep)
-        print(sep)
-
-    # Summary (always)
-    print("\n".join(summary))
-
-    # Notes (dry-run only)
-    if is_dry_run:
-        print(sep)
-        print("\n".join(notes))
+    sys.stdout.write(buf.render())
 
 
 def parse_target_codes(argv_codes):
@@ -713,6 +1006,12 @@ def main():
         help="Report intended changes without writing or uploading",
     )
 
+    p.add_argument(
+        "--stream",
+        action="store_true",
+        help="Bulk mode: read/rewrite the file entry by entry to keep memory flat (requires ijson)",
+    )
+
     # optional GitHub push parameters
     p.add_argument("--user", default=None, help="GitHub username or org that owns the repo (optional)")
     p.add_argument("--repo", default=None, help="GitHub repository name (optional)")
@@ -723,6 +1022,9 @@ def main():
     # Enforce comma-separated format for multiple codes
     parsed_codes = parse_target_codes(args.codes)
 
+    if args.stream and ijson is None:
+        raise SystemExit("--stream requires the optional 'ijson' package: pip install ijson")
+
     # Determine reference/stamp time once
     provided_expires = args.expires is not None
     if provided_expires:
@@ -755,7 +1057,9 @@ def main():
 
     else:
         # Bulk sweep mode
-        changed, stats, details = sweep_expired_by_timestamp(args.file, ref_dt, dry_run=args.dry_run)
+        changed, stats, details = sweep_expired_by_timestamp(
+            args.file, ref_dt, dry_run=args.dry_run, stream=args.stream
+        )
 
         # Unified reporting for both dry-run and real runs
         print_bulk_report(details, stats, ref_dt, args.dry_run)
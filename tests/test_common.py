@@ -0,0 +1,157 @@
+import io
+import logging
+import queue
+from logging.handlers import QueueHandler
+
+import pytest
+from rich.console import Console
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+from common import LegacyRichHandler, LogListener, PlainLogHandler, flush_logs
+
+
+def make_logger(name, handler):
+    logger = logging.getLogger(f"autoshift_test.{name}")
+    logger.handlers = [handler]
+    logger.setLevel(logging.DEBUG)
+    logger.propagate = False
+    return logger
+
+
+def plain_handler():
+    stream = io.StringIO()
+    return PlainLogHandler(Console(file=stream)), stream
+
+
+@pytest.fixture
+def rich_handler():
+    stream = io.StringIO()
+    console = Console(file=stream, color_system=None, soft_wrap=True, emoji=False, highlight=False)
+    return LegacyRichHandler(console), stream
+
+
+def test_exception_traceback_is_rendered():
+    handler, stream = plain_handler()
+    logger = make_logger("exception", handler)
+    try:
+        raise ValueError("boom")
+    except ValueError:
+        logger.exception("Scrape failed for %s", "polygon")
+
+    # ERROR is written straight away, no flush needed
+    out = stream.getvalue()
+    assert "[ERROR]    Scrape failed for polygon" in out
+    assert "Traceback (most recent call last):" in out
+    assert "ValueError: boom" in out
+
+
+def test_plain_handler_line_format_and_markup():
+    handler, stream = plain_handler()
+    logger = make_logger("plain", handler)
+    logger.info("literal [bold]brackets[/bold]")
+    logger.info("[bold]styled[/bold]", extra={"rich_markup": True})
+    logger.debug("with module")
+    handler.flush()
+
+    lines = stream.getvalue().splitlines()
+    assert lines[0].endswith("[INFO]     literal [bold]brackets[/bold]")
+    assert lines[1].endswith("[INFO]     styled")
+    # DEBUG lines carry module:lineno of the call site
+    assert lines[2].split("[DEBUG]    ")[1].startswith("test_common:")
+    assert lines[2].endswith(" - with module")
+
+
+def test_rich_handler_escapes_unless_rich_markup(rich_handler):
+    handler, stream = rich_handler
+    logger = make_logger("rich", handler)
+    logger.info("literal [bold]brackets[/bold] in C:\\data\\[x].json")
+    logger.info("[bold]styled[/bold]", extra={"rich_markup": True})
+    handler.flush()
+
+    lines = stream.getvalue().splitlines()
+    assert lines[0].endswith("[INFO]     literal [bold]brackets[/bold] in C:\\data\\[x].json")
+    assert lines[1].endswith("[INFO]     styled")
+
+
+def test_rich_handler_bad_markup_only_drops_its_own_record(monkeypatch):
+    stream = io.StringIO()
+    handler = LegacyRichHandler(Console(file=stream, color_system=None, soft_wrap=True))
+    failed = []
+    monkeypatch.setattr(handler, "handleError", failed.append)
+    logger = make_logger("bad_markup", handler)
+    logger.info("before")
+    logger.info("bad [/nope] tag", extra={"rich_markup": True})
+    logger.info("after")
+    handler.flush()
+
+    assert [record.getMessage() for record in failed] == ["bad [/nope] tag"]
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("before")
+    assert lines[1].endswith("after")
+
+
+def test_rich_handler_unclosed_markup_does_not_restyle_next_line():
+    stream = io.StringIO()
+    console = Console(file=stream, color_system="standard", force_terminal=True, soft_wrap=True)
+    handler = LegacyRichHandler(console)
+    logger = make_logger("unclosed", handler)
+    logger.info("[red]unclosed", extra={"rich_markup": True})
+    logger.info("after")
+    handler.flush()
+
+    first, second = stream.getvalue().splitlines()
+    assert "\x1b[31munclosed" in first
+    assert second.endswith("after")
+    assert "\x1b[31m" not in second
+
+
+def test_buffer_holds_info_until_warning_or_flush():
+    handler, stream = plain_handler()
+    logger = make_logger("buffer", handler)
+    logger.info("first")
+    assert stream.getvalue() == ""
+
+    logger.warning("second")
+    lines = stream.getvalue().splitlines()
+    assert len(lines) == 2
+    assert lines[0].endswith("[INFO]     first")
+    assert lines[1].endswith("[WARNING]  second")
+
+    logger.info("third")
+    handler.flush()
+    assert stream.getvalue().splitlines()[-1].endswith("third")
+
+
+def test_buffer_writes_when_full():
+    handler, stream = plain_handler()
+    logger = make_logger("full", handler)
+    for i in range(handler.BUFFER_LIMIT):
+        logger.info("line %d", i)
+    assert len(stream.getvalue().splitlines()) == handler.BUFFER_LIMIT
+
+
+def test_flush_logs_drains_listener_before_returning():
+    handler, stream = plain_handler()
+    queue_handler = QueueHandler(queue.SimpleQueue())
+    listener = LogListener(queue_handler.queue, handler, respect_handler_level=True)
+    queue_handler.listener = listener
+    listener.start()
+    try:
+        logger = make_logger("listener", queue_handler)
+        for i in range(100):
+            logger.info("queued %d", i)
+        flush_logs(logger)
+        # Anything written after flush_logs() (e.g. print()) must come after the log lines
+        stream.write("printed\n")
+
+        lines = stream.getvalue().splitlines()
+        assert len(lines) == 101
+        assert lines[99].endswith("queued 99")
+        assert lines[-1] == "printed"
+    finally:
+        listener.stop()
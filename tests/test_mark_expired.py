@@ -0,0 +1,174 @@
+import json
+
+import pytest
+from datetime import datetime, timezone
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import mark_expired
+from mark_expired import (
+    EXPIRY_ABSOLUTE,
+    EXPIRY_NEEDS_YEAR,
+    parse_expiry_absolute,
+    parse_expiry_relative,
+    parse_expiry_to_utc,
+    sweep_expired_by_timestamp,
+)
+
+REF = datetime(2025, 10, 1, tzinfo=timezone.utc)
+
+
+@pytest.mark.parametrize("value", [None, "", "   ", "Unknown", " unknown ", 42, "soon"])
+def test_parse_expiry_missing_unknown_or_invalid(value):
+    assert parse_expiry_to_utc(value, REF, None) is None
+
+
+def test_parse_expiry_date_only_iso_is_central_midnight():
+    # 2025-09-28 00:00 CDT (UTC-05:00)
+    assert parse_expiry_to_utc("2025-09-28", REF, None) == datetime(
+        2025, 9, 28, 5, 0, tzinfo=timezone.utc
+    )
+
+
+@pytest.mark.parametrize(
+    "value",
+    ["Sep 28, 2025", "Sept 28th, 2025", "September 28 2025", "28 Sep 2025", "09/28/2025"],
+)
+def test_parse_expiry_common_formats(value):
+    assert parse_expiry_to_utc(value, REF, None) == datetime(
+        2025, 9, 28, 5, 0, tzinfo=timezone.utc
+    )
+
+
+def test_parse_expiry_named_month_with_12h_time():
+    # 12 AM is midnight; CST (UTC-06:00) applies in December
+    assert parse_expiry_to_utc("Dec 1, 2025 12:15 AM", REF, None) == datetime(
+        2025, 12, 1, 6, 15, tzinfo=timezone.utc
+    )
+    assert parse_expiry_to_utc("Dec 1, 2025 12:15 PM", REF, None) == datetime(
+        2025, 12, 1, 18, 15, tzinfo=timezone.utc
+    )
+    assert parse_expiry_to_utc("Dec 1, 2025 13:15 PM", REF, None) is None
+
+
+def test_parse_expiry_month_day_uses_archived_year():
+    # Archived late December: a January date belongs to the following year
+    assert parse_expiry_to_utc("Jan 5", REF, "2024-12-20T12:00:00+00:00") == datetime(
+        2025, 1, 5, 6, 0, tzinfo=timezone.utc
+    )
+    # No archived date: fall back to the reference year
+    assert parse_expiry_to_utc("Sep 28", REF, None) == datetime(
+        2025, 9, 28, 5, 0, tzinfo=timezone.utc
+    )
+
+
+def test_parse_expiry_absolute_flags_month_day_only():
+    kind, dt = parse_expiry_absolute("Sep 28, 2025")
+    assert kind == EXPIRY_ABSOLUTE
+    assert dt == datetime(2025, 9, 28, 5, 0, tzinfo=timezone.utc)
+
+    assert parse_expiry_absolute("soon") == (EXPIRY_ABSOLUTE, None)
+    assert parse_expiry_absolute("Jan 5")[0] == EXPIRY_NEEDS_YEAR
+    # The year is only chosen once a reference/archived date is supplied
+    assert parse_expiry_relative("Jan 5", REF, "2024-12-20T12:00:00+00:00") == datetime(
+        2025, 1, 5, 6, 0, tzinfo=timezone.utc
+    )
+
+
+def _generated_shiftcodes(n=200):
+    # Shaped like autoshift_scraper.generateAutoshiftJSON() output, timestamps included
+    codes = [
+        {
+            "code": f"A{i:04d}-BBBBB-CCCCC-DDDDD-EEEEE",
+            "type": "shift",
+            "game": "Borderlands 4",
+            "platform": ("steam", "epic", "xbox")[i % 3],
+            "reward": "3 Golden Keys",
+            "archived": "2025-09-28T05:12:25.393359+00:00",
+            "expires": ("Sep 30, 2025", "Unknown", None)[i % 3],
+            "expired": i % 2 == 0,
+            "link": "https://example.com/codes?page=1",
+        }
+        for i in range(n)
+    ]
+    meta = {
+        "version": "2",
+        "generated": {
+            "utc_iso": "2025-10-15T04:10:25.393359Z",
+            "epoch_ms": 1760501425393,
+            "central_local": "Oct 14, 2025, 11:10 PM UTC-05:00",
+        },
+        "newcodecount": 0,
+    }
+    return [{"meta": meta, "codes": codes}]
+
+
+def test_save_file_uses_orjson_for_generated_data(tmp_path):
+    pytest.importorskip("orjson")
+    data = _generated_shiftcodes()
+    assert mark_expired._dumps_orjson(data) is not None
+
+    fn = tmp_path / "shiftcodes.json"
+    mark_expired.save_file(str(fn), data)
+    assert fn.read_bytes() == json.dumps(data, indent=2).encode("ascii")
+
+
+@pytest.mark.parametrize("extra", [1.5, 1e16, float("nan"), "café", [{"n": 0.1}]])
+def test_save_file_falls_back_to_json_byte_identical(tmp_path, extra):
+    data = _generated_shiftcodes(3)
+    data[0]["codes"][1]["extra"] = extra
+    if mark_expired.orjson is not None:
+        assert mark_expired._dumps_orjson(data) is None
+
+    fn = tmp_path / "shiftcodes.json"
+    mark_expired.save_file(str(fn), data)
+    assert fn.read_text(encoding="utf-8") == json.dumps(data, indent=2)
+
+
+def test_sweep_stream_matches_full_load(tmp_path):
+    pytest.importorskip("ijson")
+    data = [
+        {
+            "meta": {"version": "2", "description": "café"},
+            "codes": [
+                {"code": "AAAAA-AAAAA-AAAAA-AAAAA-AAAAA", "expires": "2025-09-01", "expired": False},
+                {"code": "BBBBB-BBBBB-BBBBB-BBBBB-BBBBB", "expires": "Unknown", "expired": False},
+                {"code": "CCCCC-CCCCC-CCCCC-CCCCC-CCCCC", "expires": "Dec 1, 2025", "expired": False},
+            ],
+        }
+    ]
+    full = tmp_path / "full.json"
+    streamed = tmp_path / "streamed.json"
+    for fn in (full, streamed):
+        fn.write_text(json.dumps(data, indent=2), encoding="utf-8")
+
+    result_full = sweep_expired_by_timestamp(str(full), REF)
+    result_streamed = sweep_expired_by_timestamp(str(streamed), REF, stream=True)
+
+    assert result_streamed == result_full
+    assert result_full[1]["set_expired"] == 1
+    assert streamed.read_bytes() == full.read_bytes()
+
+
+@pytest.mark.parametrize(
+    "data",
+    [
+        [1, {"meta": {}, "codes": []}],
+        [[], {"codes": []}],
+        [{"meta": {}}, {"codes": []}],
+        [],
+    ],
+)
+def test_sweep_stream_rejects_unexpected_layout(tmp_path, data):
+    pytest.importorskip("ijson")
+    fn = tmp_path / "shiftcodes.json"
+    text = json.dumps(data, indent=2)
+    fn.write_text(text, encoding="utf-8")
+
+    for stream in (False, True):
+        with pytest.raises(SystemExit, match="Unexpected shiftcodes.json format"):
+            sweep_expired_by_timestamp(str(fn), REF, stream=stream)
+    assert fn.read_text(encoding="utf-8") == text
@@ -0,0 +1,151 @@
+import base64
+from types import SimpleNamespace
+
+import pytest
+from github.GithubException import GithubException, UnknownObjectException
+
+import sys
+import os
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+
+import mark_expired
+
+
+class LazyRef:
+    """Mimic newer PyGithub: get_git_ref() returns a lazy GitRef that only fails on read."""
+
+    def __init__(self, sha=None, status=None):
+        self._sha = sha
+        self._status = status
+
+    @property
+    def object(self):
+        if self._status is not None:
+            raise GithubException(self._status, {"message": "Git Repository is empty."}, None)
+        return SimpleNamespace(sha=self._sha)
+
+
+class FakeRepo:
+    default_branch = "main"
+
+    def __init__(self, contents_status=None, remote_blob_sha=None, create_file_status=None, ref_status=None):
+        self.contents_status = contents_status
+        self.remote_blob_sha = remote_blob_sha
+        self.create_file_status = create_file_status
+        self.ref_status = ref_status
+        self.calls = []
+        self.blobs = []
+
+    def get_contents(self, path, ref=None):
+        self.calls.append(("get_contents", path, ref))
+        if self.contents_status == 404:
+            raise UnknownObjectException(404, {"message": "Not Found"}, None)
+        if self.contents_status is not None:
+            raise GithubException(self.contents_status, {"message": "nope"}, None)
+        return SimpleNamespace(path=path, sha=self.remote_blob_sha)
+
+    def update_file(self, path, message, content, sha, branch=None):
+        self.calls.append(("update_file", path, sha, branch))
+        self.blobs.append(content)
+        return {}
+
+    def create_file(self, path, message, content, branch=None):
+        self.calls.append(("create_file", path, branch))
+        if self.create_file_status is not None:
+            raise GithubException(self.create_file_status, {"message": "nope"}, None)
+        self.blobs.append(content)
+        return {}
+
+    def get_git_ref(self, ref):
+        self.calls.append(("get_git_ref", ref))
+        return LazyRef(sha="head", status=self.ref_status)
+
+    def create_git_blob(self, content, encoding):
+        self.calls.append(("create_git_blob", encoding))
+        self.blobs.append(base64.b64decode(content))
+        return SimpleNamespace(sha="new-blob")
+
+    def create_git_tree(self, elements, base_tree=None):
+        self.calls.append(("create_git_tree", getattr(base_tree, "sha", None)))
+        return SimpleNamespace(sha="new-tree")
+
+    def create_git_commit(self, message, tree, parents):
+        self.calls.append(("create_git_commit", message, [p.sha for p in parents]))
+        return SimpleNamespace(sha="new-commit")
+
+    def create_git_ref(self, ref, sha):
+        self.calls.append(("create_git_ref", ref, sha))
+
+
+@pytest.fixture
+def shiftfile(tmp_path):
+    fn = tmp_path / "shiftcodes.json"
+    fn.write_bytes(b'[\n  {\n    "codes": []\n  }\n]')
+    return fn
+
+
+def upload(monkeypatch, repo, fn):
+    monkeypatch.setattr(mark_expired, "Github", lambda token: SimpleNamespace(get_repo=lambda name: repo))
+    return mark_expired.upload_shiftfile(str(fn), "user", "repo", "token", commit_msg="msg")
+
+
+def test_upload_skips_when_remote_blob_matches(monkeypatch, shiftfile):
+    # `git hash-object` of the fixture content
+    repo = FakeRepo(remote_blob_sha="8e2ff9e3630cee332847fdcf893712c32e8d3170")
+    assert upload(monkeypatch, repo, shiftfile) is True
+    assert repo.calls == [("get_contents", "shiftcodes.json", "main")]
+    assert repo.blobs == []
+
+
+def test_upload_updates_existing_file(monkeypatch, shiftfile):
+    repo = FakeRepo(remote_blob_sha="0" * 40)
+    assert upload(monkeypatch, repo, shiftfile) is True
+    assert repo.calls == [
+        ("get_contents", "shiftcodes.json", "main"),
+        ("update_file", "shiftcodes.json", "0" * 40, "main"),
+    ]
+    assert repo.blobs == [shiftfile.read_bytes()]
+
+
+@pytest.mark.parametrize("status", [404, 409])
+def test_upload_creates_missing_file_or_first_commit(monkeypatch, shiftfile, status):
+    repo = FakeRepo(contents_status=status)
+    assert upload(monkeypatch, repo, shiftfile) is True
+    assert repo.calls == [
+        ("get_contents", "shiftcodes.json", "main"),
+        ("create_file", "shiftcodes.json", "main"),
+    ]
+    assert repo.blobs == [shiftfile.read_bytes()]
+
+
+def test_upload_reports_other_lookup_errors(monkeypatch, shiftfile):
+    repo = FakeRepo(contents_status=403)
+    assert upload(monkeypatch, repo, shiftfile) is False
+    assert repo.calls == [("get_contents", "shiftcodes.json", "main")]
+
+
+@pytest.mark.parametrize("status", [404, 409])
+def test_upload_bootstrap_falls_back_to_git_data_api(monkeypatch, shiftfile, status):
+    repo = FakeRepo(contents_status=404, create_file_status=422, ref_status=status)
+    assert upload(monkeypatch, repo, shiftfile) is True
+    assert repo.calls == [
+        ("get_contents", "shiftcodes.json", "main"),
+        ("create_file", "shiftcodes.json", "main"),
+        ("get_git_ref", "heads/main"),
+        ("create_git_blob", "base64"),
+        ("create_git_tree", None),
+        ("create_git_commit", "msg", []),
+        ("create_git_ref", "refs/heads/main", "new-commit"),
+    ]
+    assert repo.blobs == [shiftfile.read_bytes()]
+
+
+def test_upload_create_failure_on_existing_branch_is_reported(monkeypatch, shiftfile):
+    repo = FakeRepo(contents_status=404, create_file_status=422)
+    assert upload(monkeypatch, repo, shiftfile) is False
+    assert repo.calls == [
+        ("get_contents", "shiftcodes.json", "main"),
+        ("create_file", "shiftcodes.json", "main"),
+        ("get_git_ref", "heads/main"),
+    ]